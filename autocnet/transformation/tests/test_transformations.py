@@ -1,6 +1,8 @@
 import os
+import pickle
 import sys
 import unittest
+from unittest import mock
 import warnings
 sys.path.insert(0, os.path.abspath('..'))
 
@@ -10,6 +12,33 @@ import pandas as pd
 from autocnet.transformation import transformations
 
 
+def _two_view_scene(n, seed):
+    """
+    Project n random points through two pixel scale cameras that both look
+    at them.
+
+    Returns
+    -------
+    x1, x2 : ndarray
+             (n, 3) homogeneous, noise free correspondences
+    """
+    np.random.seed(seed)
+    k = np.array([[1000, 0, 500], [0, 1000, 500], [0, 0, 1.]])
+    theta = 0.1
+    r = np.array([[np.cos(theta), 0, np.sin(theta)],
+                  [0, 1, 0],
+                  [-np.sin(theta), 0, np.cos(theta)]])
+    p = k.dot(np.eye(3, 4))
+    p1 = k.dot(np.hstack((r, np.array([[-1.], [0.1], [0.05]]))))
+
+    pts = np.hstack((np.random.uniform(-2, 2, (n, 2)),
+                     np.random.uniform(4, 8, (n, 1)),
+                     np.ones((n, 1))))
+    x1 = p.dot(pts.T)
+    x2 = p1.dot(pts.T)
+    return (x1 / x1[2]).T, (x2 / x2[2]).T
+
+
 class TestHomography(unittest.TestCase):
 
     def test_Homography(self):
@@ -39,6 +68,93 @@ class TestHomography(unittest.TestCase):
         description = H.describe_error
         self.assertIsInstance(description, pd.DataFrame)
 
+    def test_Homography_inverse(self):
+        static_H = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+        H = transformations.Homography(static_H.copy(), index=np.arange(20))
+        np.testing.assert_array_almost_equal(H.inverse, np.linalg.inv(static_H))
+        np.testing.assert_array_almost_equal(H.inverse.dot(static_H), np.eye(3))
+
+        # The cached inverse can not be corrupted by callers
+        with self.assertRaises(ValueError):
+            H.inverse[0, 0] = 0
+
+        # In place mutation invalidates the cache
+        H *= 0.5
+        np.testing.assert_array_almost_equal(H.inverse, np.linalg.inv(static_H * 0.5))
+        H[:] = static_H
+        np.testing.assert_array_almost_equal(H.inverse, np.linalg.inv(static_H))
+
+    @unittest.skipUnless(transformations.njit is not None, 'numba is not installed')
+    def test_Homography_residual_kernel(self):
+        np.random.seed(12345)
+        nbr_inliers = 20
+        fp = np.array(np.random.standard_normal((nbr_inliers, 2)))
+        static_H = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+
+        fph = np.hstack((fp, np.ones((nbr_inliers, 1))))
+        tp = static_H.dot(fph.T)
+        tp /= tp[-1, :np.newaxis]
+        # Perturb the destination so that the residuals are non-zero
+        tp[:2] += np.random.normal(0, 0.5, (2, nbr_inliers))
+
+        H = transformations.Homography(static_H, index=np.arange(20))
+        H.x1 = pd.DataFrame(fp, columns=['x', 'y'])
+        H.x2 = pd.DataFrame(tp.T[:, :2], columns=['x', 'y'])
+
+        jitted = H.error
+        with mock.patch.object(transformations, 'njit', None):
+            vectorized = H.error
+
+        np.testing.assert_array_almost_equal(jitted.values, vectorized.values, 12)
+        self.assertAlmostEqual(jitted.total_rms, vectorized.total_rms, 12)
+        self.assertAlmostEqual(jitted.x_rms, vectorized.x_rms, 12)
+        self.assertAlmostEqual(jitted.y_rms, vectorized.y_rms, 12)
+        self.assertGreater(jitted.total_rms, 0)
+
+    def test_Homography_compute_normalized(self):
+        np.random.seed(12345)
+        nbr_inliers = 20
+        fp = np.array(np.random.standard_normal((nbr_inliers, 2)))
+        static_H = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+
+        fph = np.hstack((fp, np.ones((nbr_inliers, 1))))
+        tp = static_H.dot(fph.T)
+        tp /= tp[-1, :np.newaxis]
+
+        H = transformations.Homography(np.zeros((3, 3)), index=np.arange(20))
+        H.compute(fp, tp.T[:, :2], method='normal', normalize=True)
+        np.testing.assert_array_almost_equal(H, static_H, decimal=4)
+
+    def test_Homography_compute_normalized_ransac(self):
+        np.random.seed(12345)
+        npts = 50
+        nbr_outliers = 10
+        static_H = np.array([[1.1, 0.05, 20], [0.02, 0.95, -15], [1e-4, 5e-5, 1]])
+
+        fp = np.random.uniform(0, 1000, (npts, 2))
+        tp = static_H.dot(np.hstack((fp, np.ones((npts, 1)))).T)
+        tp = (tp[:2] / tp[2]).T
+
+        # Replace the tail with gross outliers
+        tp[-nbr_outliers:] = np.random.uniform(0, 1000, (nbr_outliers, 2))
+
+        H = transformations.Homography(np.zeros((3, 3)), index=np.arange(npts))
+        H.compute(fp, tp, method='ransac', reproj_threshold=1.0, normalize=True)
+        np.testing.assert_array_almost_equal(H, static_H, decimal=4)
+
+        # The pixel threshold was mapped into the normalized space
+        mask = H.mask.ravel()
+        self.assertTrue(mask[:-nbr_outliers].all())
+        self.assertFalse(mask[-nbr_outliers:].any())
+
+    def test_Homography_pickle(self):
+        static_H = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+        H = transformations.Homography(static_H.copy(), index=np.arange(20))
+        loaded = pickle.loads(pickle.dumps(H))
+        self.assertEqual(loaded.rank, 3)
+        self.assertAlmostEqual(loaded.condition, 7.19064438, 5)
+        np.testing.assert_array_almost_equal(loaded.inverse, np.linalg.inv(static_H))
+
     def test_Homography_fail(self):
         with self.assertRaises(TypeError):
             transformations.Homography([1,2,3], np.arange(3), np.arange(3), None)
@@ -76,12 +192,87 @@ class TestFundamentalMatrix(unittest.TestCase):
                                                           [-0.704199, 12.88776,  -3.040341],
                                                           [-0.231815, -2.806056, 1.]]))
 
+    def test_compute_f_keeps_columns(self):
+        np.random.seed(12345)
+        nbr_inliers = 20
+        columns = ['x', 'y', 'h']
+        fp = pd.DataFrame(np.hstack((np.random.standard_normal((nbr_inliers, 2)),
+                                     np.ones((nbr_inliers, 1)))), columns=columns)
+        tp = pd.DataFrame(np.hstack((np.random.standard_normal((nbr_inliers, 2)),
+                                     np.ones((nbr_inliers, 1)))), columns=columns)
+
+        F = transformations.FundamentalMatrix(np.zeros((3,3)), index=np.arange(20))
+        F.compute(fp, tp, method='ransac')
+
+        self.assertEqual(list(F.x1.columns), columns)
+        self.assertEqual(list(F.x2.columns), columns)
+        np.testing.assert_array_equal(F.x1.index, np.arange(20))
+        np.testing.assert_array_almost_equal(F.x2.values, tp.values)
+
+    def test_compute_f_normalized(self):
+        npts = 50
+        nbr_outliers = 10
+        x1, x2 = _two_view_scene(npts, 12345)
+
+        # Replace the tail with gross outliers
+        x2[-nbr_outliers:, :2] = np.random.uniform(0, 1000, (nbr_outliers, 2))
+
+        F = transformations.FundamentalMatrix(np.zeros((3,3)), index=np.arange(npts))
+        F.compute(x1, x2, method='ransac', reproj_threshold=1.0, normalize=True)
+
+        # De-normalized F is scaled to F[2,2] = 1 and rank 2
+        self.assertAlmostEqual(F[2, 2], 1.0)
+        self.assertEqual(F.rank, 2)
+
+        # The pixel threshold was mapped into the normalized space
+        self.assertTrue(F.mask[:-nbr_outliers].all())
+        self.assertFalse(F.mask[-nbr_outliers:].any())
+
+        # Inliers lie on their epipolar lines in pixel space
+        error = F.compute_error(x1[:-nbr_outliers], x2[:-nbr_outliers])
+        self.assertLess(error.max(), 0.1)
+
+    def test_compute_f_mle_improves_ransac(self):
+        npts = 60
+        x1, x2 = _two_view_scene(npts, 12345)
+
+        # Half pixel noise on the observed correspondences
+        y1 = x1.copy()
+        y2 = x2.copy()
+        y1[:, :2] += np.random.normal(0, 0.5, (npts, 2))
+        y2[:, :2] += np.random.normal(0, 0.5, (npts, 2))
+
+        errors = {}
+        for method in ['ransac', 'mle']:
+            F = transformations.FundamentalMatrix(np.zeros((3,3)), index=np.arange(npts))
+            F.compute(y1, y2, method=method, reproj_threshold=2.0)
+            errors[method] = (F.compute_error(y1, y2).mean(),
+                              F.compute_error(x1, x2).mean())
+
+        # The gold standard refinement improves on the RANSAC estimate for
+        # both the observed and the noise free correspondences
+        self.assertLess(errors['mle'][0], errors['ransac'][0])
+        self.assertLess(errors['mle'][1], errors['ransac'][1])
+
     def test_f_error(self):
         self.assertIsInstance(self.F.error, pd.Series)
 
     def test_f_determinant(self):
         self.assertAlmostEqual(self.F.determinant, 0.624999, 5)
 
+    def test_f_pickle(self):
+        F = transformations.FundamentalMatrix(np.diag([4., 2., 0.]), index=np.arange(20))
+        loaded = pickle.loads(pickle.dumps(F))
+        self.assertEqual(loaded.rank, 2)
+        self.assertAlmostEqual(loaded.condition, 2.0)
+
+    def test_f_determinant_inplace_mutation(self):
+        static_F = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+        F = transformations.FundamentalMatrix(static_F.copy(), index=np.arange(20))
+        self.assertAlmostEqual(F.determinant, 0.625, 5)
+        F *= 0.5
+        self.assertAlmostEqual(F.determinant, 0.625 * 0.125, 5)
+
     def test_f_rank(self):
         # Degenerate Case
         self.assertEqual(self.F.rank, 3)
@@ -98,4 +289,82 @@ class TestFundamentalMatrix(unittest.TestCase):
         self.assertEqual(self.F._current_action_stack, 1)
 
         self.F._clean_attrs()
-        self.assertNotIn('_error', self.F.__dict__)
+        self.assertIsNone(self.F._error)
+
+    def test_f_action_stack_wraparound(self):
+        static_F = np.array([[4, 0.5, 10], [0.25, 1, 5], [0.2, 0.1, 1]])
+        F = transformations.FundamentalMatrix(static_F.copy(), index=np.arange(20))
+        F.x1 = self.F.x1
+        F.x2 = self.F.x2
+
+        # Rolling back to the initial state restores the empty mask
+        F.refine_matches()
+        F.rollback(5)
+        self.assertIsNone(F.mask)
+        F.mask = pd.Series(True, index=np.arange(20))
+
+        error = F.compute_error(F.x1.values, F.x2.values)
+        thresholds = np.linspace(error.min(), error.max(), 11)
+        for i, t in enumerate(thresholds):
+            # Scaling F leaves the error unchanged but tags the stored state
+            F[:] = static_F * (i + 2)
+            F.refine_matches(threshold=t)
+
+        # 13 states were pushed, only the newest 10 are retained
+        self.assertEqual(len(F._action_stack), 10)
+        self.assertEqual(F._current_action_stack, 9)
+
+        F.rollback(20)
+        self.assertEqual(F._current_action_stack, 0)
+        np.testing.assert_array_almost_equal(F, static_F * 3)
+        np.testing.assert_array_equal(F.mask, error <= thresholds[0])
+
+        F.rollforward(20)
+        self.assertEqual(F._current_action_stack, 9)
+        np.testing.assert_array_almost_equal(F, static_F * 12)
+        np.testing.assert_array_equal(F.mask, error <= thresholds[9])
+
+    def test_f_subscribe(self):
+        calls = []
+
+        class Watcher(object):
+            def __init__(self, name):
+                self.name = name
+
+            def update(self, *args):
+                calls.append(self.name)
+
+        first = Watcher('first')
+        second = Watcher('second')
+        F = transformations.FundamentalMatrix(np.eye(3), index=np.arange(20))
+
+        # Each attribute access creates a new bound method object
+        F.subscribe(first.update)
+        F.subscribe(first.update)
+        F.subscribe(second.update)
+        self.assertEqual(len(F._observers), 2)
+
+        F._notify_subscribers()
+        self.assertEqual(calls, ['first', 'second'])
+
+    def test_f_svd_cache_invalidation(self):
+        F = transformations.FundamentalMatrix(np.eye(3), index=np.arange(20))
+        self.assertEqual(F.rank, 3)
+        F[:] = np.diag([1, 1, 0])
+        self.assertEqual(F.rank, 2)
+
+    def test_f_svd_cache_inplace_mutation(self):
+        F = transformations.FundamentalMatrix(np.diag([4., 2., 1.]), index=np.arange(20))
+        self.assertEqual(F.rank, 3)
+        self.assertAlmostEqual(F.condition, 2.0)
+
+        # In place operations bypass __setitem__
+        np.multiply(F, np.diag([1., 1., 0.]), out=F)
+        self.assertEqual(F.rank, 2)
+
+        np.copyto(F, np.diag([8., 2., 1.]))
+        self.assertEqual(F.rank, 3)
+        self.assertAlmostEqual(F.condition, 4.0)
+
+        F *= 0.5
+        np.testing.assert_array_almost_equal(F._compute_svd_s(), [4., 1., 0.5])
@@ -1,6 +1,5 @@
 import abc
 import math
-from collections import deque
 import warnings
 
 import cv2
@@ -9,79 +8,272 @@ import pandas as pd
 import pysal as ps
 from scipy import optimize
 
-from autocnet.utils.utils import make_homogeneous, normalize_vector, crossform
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 from autocnet.camera import camera
 from autocnet.camera import utils as camera_utils
 
 
-class TransformationMatrix(np.ndarray):
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _homog_residuals(H, a, b, out):
+        """
+        Project the homogeneous points a using H and write the x residual,
+        y residual and rmse to the first three columns of out.
+
+        Returns
+        -------
+        sx2, sy2 : float
+                   The sum of the squared x and y residuals
+        """
+        n = a.shape[0]
+        sx2 = 0.0
+        sy2 = 0.0
+        for i in prange(n):
+            u = H[0, 0] * a[i, 0] + H[0, 1] * a[i, 1] + H[0, 2] * a[i, 2]
+            v = H[1, 0] * a[i, 0] + H[1, 1] * a[i, 1] + H[1, 2] * a[i, 2]
+            w = H[2, 0] * a[i, 0] + H[2, 1] * a[i, 1] + H[2, 2] * a[i, 2]
+            u /= w
+            v /= w
+            xr = b[i, 0] - u
+            yr = b[i, 1] - v
+            out[i, 0] = xr
+            out[i, 1] = yr
+            out[i, 2] = math.sqrt(xr * xr + yr * yr)
+            sx2 += xr * xr
+            sy2 += yr * yr
+        return sx2, sy2
+
+
+def _as_cv(a):
+    """
+    Return a C contiguous float32 array for OpenCV, which converts all point
+    inputs to float32 internally.  Inputs that already match are returned
+    without a copy.
+    """
+    a = np.asarray(a)
+    if a.dtype == np.float32 and a.flags['C_CONTIGUOUS']:
+        return a
+    return np.ascontiguousarray(a, dtype=np.float32)
+
+
+def _normalize(a):
+    r"""
+    Translate and isotropically scale a set of points such that the centroid
+    is at the origin and the average distance from the origin is $\sqrt{2}$.
+
+    Parameters
+    ----------
+    a : arraylike
+        (n,2) array of x,y or (n,3) homogeneous coordinates
+
+    Returns
+    -------
+    pts : ndarray
+          (n,2) float32 array of normalized x,y coordinates
+
+    normalizer : ndarray
+                 (3,3) transformation matrix applied to the points
+    """
+    a = np.asarray(a, dtype=np.float64)
+    normalizer = camera_utils.normalize(a)
+    pts = a[:, :2] * normalizer[0, 0] + normalizer[:2, 2]
+    return _as_cv(pts), normalizer
+
+
+class _ActionStack(object):
+    """
+    A fixed length ring buffer of matrix and mask states that backs the
+    undo / redo history of a TransformationMatrix.  The storage is allocated
+    once and the oldest state is overwritten when the buffer is full.
+
+    Parameters
+    ----------
+    shape : tuple
+            The shape of the stored matrix
+
+    nmask : int
+            The length of the stored masks
+
+    dtype : object
+            The dtype of the stored matrix
+
+    maxlen : int
+             The maximum number of states to retain
+    """
+    def __init__(self, shape, nmask, dtype=np.float64, maxlen=10):
+        self.maxlen = maxlen
+        self._arr = np.empty((maxlen,) + tuple(shape), dtype=dtype)
+        self._mask = np.empty((maxlen, nmask), dtype=bool)
+        self._has_mask = np.zeros(maxlen, dtype=bool)
+        self._start = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _slot(self, idx):
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError('action stack index out of range')
+        return (self._start + idx) % self.maxlen
+
+    def append(self, arr, mask=None):
+        """
+        Copy a state into the buffer
+
+        Parameters
+        ----------
+        arr : ndarray
+              The matrix to store
+
+        mask : ndarray
+               Boolean mask to store or None
+        """
+        if self._len < self.maxlen:
+            slot = (self._start + self._len) % self.maxlen
+            self._len += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.maxlen
+
+        self._arr[slot] = arr
+        if mask is None:
+            self._has_mask[slot] = False
+        else:
+            self._mask[slot] = np.asarray(mask, dtype=bool).ravel()
+            self._has_mask[slot] = True
+
+    def __getitem__(self, idx):
+        """
+        Returns
+        -------
+        arr : ndarray
+              A view of the stored matrix
+
+        mask : ndarray
+               A view of the stored mask or None
+        """
+        slot = self._slot(idx)
+        mask = self._mask[slot] if self._has_mask[slot] else None
+        return self._arr[slot], mask
+
+
+class TransformationMatrix(np.ndarray, metaclass=abc.ABCMeta):
     """
     Abstract Base Class representing a 3x3 transformation matrix.
     This ABC subclasses numpy ndarrays.
     """
-    __metaclass__ = abc.ABCMeta
+    # Attributes propagated to every view or copy of the matrix
+    _finalize_attrs = ('_action_stack', '_current_action_stack', '_observers',
+                       '_observer_set', 'x1', 'x2', 'index', 'mask')
 
-    @abc.abstractmethod
     def __new__(cls, ndarray, index):
 
         obj = np.asarray(ndarray).view(cls)
         obj.index = index
         obj.mask = pd.Series(True, index=index)
-        obj._action_stack = deque(maxlen=10)
+        obj._action_stack = _ActionStack(obj.shape, len(index), obj.dtype)
         obj._current_action_stack = 0
-        obj._observers = set()
+        obj._observers = []
+        obj._observer_set = set()
 
-        state_package = {'arr': obj.copy(),
-                         'mask': None}
-        obj._action_stack.append(state_package)
+        obj._action_stack.append(obj)
 
         return obj
 
-    @abc.abstractmethod
     def __array_finalize__(self, obj):
+        # Cached attributes are derived from the data and start empty.  This
+        # must happen before the early return as unpickling passes obj=None.
+        self._clean_attrs()
         if obj is None:
             return
-        self._action_stack = getattr(obj, '_action_stack', None)
-        self._current_action_stack = getattr(obj, '_current_action_stack', None)
-        self._observers = getattr(obj, '_observers', None)
+        for a in self._finalize_attrs:
+            setattr(self, a, getattr(obj, a, None))
 
-        self.x1 = getattr(obj, 'x1', None)
-        self.x2 = getattr(obj, 'x2', None)
-        self.index = getattr(obj, 'index', None)
-        self.mask = getattr(obj, 'mask', None)
+    def __setitem__(self, key, value):
+        super(TransformationMatrix, self).__setitem__(key, value)
+        # The cached attributes no longer describe the matrix
+        self._clean_attrs()
 
-    @abc.abstractproperty
+    def _clean_attrs(self):
+        self._error = None
+        self._condition = None
+        self._svd_s = None
+        self._cache_key = None
+
+    def _validate_cache(self):
+        """
+        Clear the cached attributes if the matrix data has changed since they
+        were computed.  In place arithmetic and np.copyto write to the buffer
+        without passing through __setitem__, so the data itself is the key.
+        """
+        key = self.tobytes()
+        if key != self._cache_key:
+            self._clean_attrs()
+            self._cache_key = key
+
+    def _compute_svd_s(self):
+        """
+        Lazily compute and cache the singular values of the matrix.
+        """
+        self._validate_cache()
+        if self._svd_s is None:
+            self._svd_s = np.linalg.svd(np.asarray(self), compute_uv=False)
+        return self._svd_s
+
+    @property
     def determinant(self):
-        return np.linalg.det(self)
+        # Closed form 3x3 cofactor expansion avoids the LAPACK round trip
+        a = np.asarray(self)
+        return float(a[0, 0] * (a[1, 1] * a[2, 2] - a[1, 2] * a[2, 1]) -
+                     a[0, 1] * (a[1, 0] * a[2, 2] - a[1, 2] * a[2, 0]) +
+                     a[0, 2] * (a[1, 0] * a[2, 1] - a[1, 1] * a[2, 0]))
 
-    @abc.abstractproperty
+    @property
     def rank(self):
-        return np.linalg.matrix_rank(self)
+        s = self._compute_svd_s()
+        tol = s.max() * max(self.shape) * np.finfo(s.dtype).eps
+        return int((s > tol).sum())
 
-    @abc.abstractproperty
+    @property
     def condition(self):
         """
         The condition is a measure of the numerical stability of the
         solution to a set of linear equations.
         """
-        if not getattr(self, '_condition', None):
-            s = np.linalg.svd(self, compute_uv=False)
+        s = self._compute_svd_s()
+        if self._condition is None:
             self._condition = s[0] / s[1]
         return self._condition
 
-    @abc.abstractproperty
+    @property
     def error(self):
-        if not hasattr(self, '_error'):
+        self._validate_cache()
+        if self._error is None:
             self._error = self.compute_error(self.x1,
                                              self.x2,
                                              self.mask)
         return self._error
 
-    @abc.abstractproperty
+    @property
     def describe_error(self):
         return self.error.describe()
 
-    @abc.abstractmethod
+    def _restore_state(self, idx):
+        """
+        Set the matrix and mask to a state stored on the action stack
+        """
+        arr, mask = self._action_stack[idx]
+        self[:] = arr
+        if mask is not None:
+            mask = pd.Series(mask.copy(), index=self.index)
+        self.mask = mask
+
     def rollback(self, n=1):
         """
         Roll backward in the object histroy, e.g. undo
@@ -96,14 +288,11 @@ class TransformationMatrix(np.ndarray):
         if idx < 0:
             idx = 0
         self._current_action_stack = idx
-        state = self._action_stack[idx]
-        self[:] = state['arr']
-        setattr(self, 'mask', state['mask'])
+        self._restore_state(idx)
         # Reset attributes (could also cache)
         self._clean_attrs()
         self._notify_subscribers(self)
 
-    @abc.abstractmethod
     def rollforward(self, n=1):
         """
         Roll forwards in the object history, e.g. do
@@ -118,14 +307,11 @@ class TransformationMatrix(np.ndarray):
         if idx > len(self._action_stack) - 1:
             idx = len(self._action_stack) - 1
         self._current_action_stack = idx
-        state = self._action_stack[idx]
-        self[:] = state['arr']
-        setattr(self, 'mask', state['mask'])
+        self._restore_state(idx)
         # Reset attributes (could also cache)
         self._clean_attrs()
         self._notify_subscribers(self)
 
-    @abc.abstractmethod
     def subscribe(self, func):
         """
         Subscribe some observer to the edge
@@ -136,9 +322,11 @@ class TransformationMatrix(np.ndarray):
         func : object
                The callable that is to be executed on update
         """
-        self._observers.add(func)
+        # The set deduplicates, the list preserves subscription order
+        if func not in self._observer_set:
+            self._observer_set.add(func)
+            self._observers.append(func)
 
-    @abc.abstractmethod
     def _notify_subscribers(self, *args, **kwargs):
         """
         The 'update' call to notify all subscribers of
@@ -187,6 +375,57 @@ class FundamentalMatrix(TransformationMatrix):
             describing the error of the points used to
             compute this homography
     """
+    # Copy the backing storage so views do not build the lazy dataframes
+    _finalize_attrs = tuple(a for a in TransformationMatrix._finalize_attrs
+                            if a not in ('x1', 'x2', 'mask')) + \
+                      ('_x1', '_x1_arr', '_x1_columns',
+                       '_x2', '_x2_arr', '_x2_columns', '_mask', '_mask_arr')
+
+    @property
+    def x1(self):
+        if self._x1 is None and self._x1_arr is not None:
+            self._x1 = pd.DataFrame(self._x1_arr, index=self.index,
+                                    columns=self._x1_columns)
+        return self._x1
+
+    @x1.setter
+    def x1(self, value):
+        self._x1 = value
+        self._x1_arr = None
+        self._x1_columns = getattr(value, 'columns', None)
+
+    @property
+    def x2(self):
+        if self._x2 is None and self._x2_arr is not None:
+            self._x2 = pd.DataFrame(self._x2_arr, index=self.index,
+                                    columns=self._x2_columns)
+        return self._x2
+
+    @x2.setter
+    def x2(self, value):
+        self._x2 = value
+        self._x2_arr = None
+        self._x2_columns = getattr(value, 'columns', None)
+
+    @property
+    def mask(self):
+        return self._mask
+
+    @mask.setter
+    def mask(self, value):
+        self._mask = value
+        self._mask_arr = None if value is None else np.asarray(value, dtype=bool)
+
+    def _as_arrays(self):
+        """
+        Return the correspondences as contiguous float64 arrays, converting
+        from the user facing dataframes only when they have been replaced.
+        """
+        if self._x1_arr is None and self._x1 is not None:
+            self._x1_arr = np.ascontiguousarray(self._x1, dtype=np.float64)
+        if self._x2_arr is None and self._x2 is not None:
+            self._x2_arr = np.ascontiguousarray(self._x2, dtype=np.float64)
+        return self._x1_arr, self._x2_arr
 
     def refine_matches(self, threshold=1.0):
         """
@@ -198,24 +437,16 @@ class FundamentalMatrix(TransformationMatrix):
         threshold : float
                     The new upper, reprojective error limit, in pixels.
         """
-        state_package = {'arr': self[:].copy(),
-                         'mask': self.mask.copy()}
+        self._action_stack.append(self, self._mask_arr)
 
-        error = self.compute_error(self.x1, self.x2)
-        self.mask = error <= threshold
+        x1, x2 = self._as_arrays()
+        error = self.compute_error(x1, x2)
+        self.mask = pd.Series(error <= threshold, index=self.index)
 
-        self._action_stack.append(state_package)
         self._current_action_stack = len(self._action_stack) - 1  # 0 based vs. 1 based
         self._clean_attrs()
         self._notify_subscribers(self)
 
-    def _clean_attrs(self):
-        for a in ['_error', '_determinant', '_condition']:
-            try:
-                delattr(self, a)
-            except:
-                pass
-
     @property
     def error(self):
         """
@@ -224,17 +455,20 @@ class FundamentalMatrix(TransformationMatrix):
 
         Returns
         -------
-        : ndarray
+        : series
           The current error
 
         See Also
         --------
         compute_error : The method called to compute element-wise error.
         """
-
-        x = self.x1[self.mask]
-        x1 = self.x2[self.mask]
-        return self.compute_error(x, x1)
+        x1, x2 = self._as_arrays()
+        index = np.asarray(self.index)
+        if self._mask_arr is not None:
+            x1 = x1[self._mask_arr]
+            x2 = x2[self._mask_arr]
+            index = index[self._mask_arr]
+        return pd.Series(self.compute_error(x1, x2), index=index)
 
     def compute_error(self, x, x1):
         """
@@ -253,11 +487,11 @@ class FundamentalMatrix(TransformationMatrix):
         Parameters
         ----------
 
-        x : dataframe
-            n,3 dataframe of homogeneous coordinates
+        x : ndarray
+            n,3 array of homogeneous coordinates
 
-        x1 : dataframe
-            n,3 dataframe of homogeneous coordinates with the same
+        x1 : ndarray
+            n,3 array of homogeneous coordinates with the same
             length as argument x
 
         Returns
@@ -266,13 +500,20 @@ class FundamentalMatrix(TransformationMatrix):
                   n,1 vector of reprojection errors
         """
 
-        # Normalize the vector
-        l_norms = normalize_vector(x.dot(self.T))
-        F_error = np.abs(np.sum(l_norms * x1, axis=1))
+        x = np.asarray(x)
+        x1 = np.asarray(x1)
+
+        # Epipolar lines in the second image and the point to line distance
+        # Transpose a base ndarray view to skip __array_finalize__
+        l = x.dot(np.asarray(self).T)
+        num = np.abs(np.einsum('ij,ij->i', l, x1))
+        den = np.sqrt(l[:, 0] * l[:, 0] + l[:, 1] * l[:, 1])
+        F_error = num / den
 
         return F_error
 
-    def compute(self, kp1, kp2, method='mle', reproj_threshold=2.0, confidence=0.99):
+    def compute(self, kp1, kp2, method='mle', reproj_threshold=2.0, confidence=0.99,
+                normalize=False):
         """
         Given two arrays of keypoints compute the fundamental matrix
 
@@ -295,6 +536,12 @@ class FundamentalMatrix(TransformationMatrix):
         confidence : float
                      [0, 1] that the estimated matrix is correct
 
+        normalize : bool
+                    If True, center and scale the correspondences before
+                    estimation and de-normalize the resulting matrix.  The
+                    reprojective threshold is scaled into the normalized
+                    space of the destination image.
+
         Notes
         -----
         While the method is user definable, if the number of input points
@@ -315,11 +562,20 @@ class FundamentalMatrix(TransformationMatrix):
         else:
             raise ValueError("Unknown estimation method. Choices are: 'lme', 'ransac', 'lmeds', '8point', or 'normal'.")
 
-        # OpenCV wants arrays
-        F, mask = cv2.findFundamentalMat(np.asarray(kp1),
-                                         np.asarray(kp2),
+        # OpenCV wants contiguous float32 arrays
+        if normalize:
+            pts1, t1 = _normalize(kp1)
+            pts2, t2 = _normalize(kp2)
+            threshold = reproj_threshold * t2[0, 0]
+        else:
+            pts1 = _as_cv(kp1)
+            pts2 = _as_cv(kp2)
+            threshold = reproj_threshold
+
+        F, mask = cv2.findFundamentalMat(pts1,
+                                         pts2,
                                          method_,
-                                         param1=reproj_threshold,
+                                         param1=threshold,
                                          param2=confidence)
 
         try:
@@ -327,12 +583,19 @@ class FundamentalMatrix(TransformationMatrix):
         except:
             return  # pragma: no cover
 
-        # Ensure that the singularity constraint is met
-        self._enforce_singularity_constraint()
-
-        # Set instance variables to inputs
-        self.x1 = pd.DataFrame(kp1, index=self.index)
-        self.x2 = pd.DataFrame(kp2, index=self.index)
+        if normalize and F.shape == (3, 3):
+            # Undo the normalization, F = T2^T F_n T1
+            F = t2.T.dot(F).dot(t1)
+            if F[2, 2] != 0:
+                F /= F[2, 2]
+
+        # Set instance variables to inputs, the dataframes are built on request
+        self._x1 = None
+        self._x2 = None
+        self._x1_arr = np.ascontiguousarray(kp1, dtype=np.float64)
+        self._x2_arr = np.ascontiguousarray(kp2, dtype=np.float64)
+        self._x1_columns = getattr(kp1, 'columns', None)
+        self._x2_columns = getattr(kp2, 'columns', None)
         self.mask = pd.Series(mask, index=self.index)
 
         try:
@@ -341,6 +604,9 @@ class FundamentalMatrix(TransformationMatrix):
             warnings.warn('F computation fell back to 7-point algorithm and returned 3 F matrices.')
             return
 
+        # Ensure that the singularity constraint is met
+        self._enforce_singularity_constraint()
+
         if method == 'mle':
             # Now apply the gold standard algorithm to refine F
 
@@ -348,9 +614,10 @@ class FundamentalMatrix(TransformationMatrix):
             p1 = camera.estimated_camera_from_f(F)
             p = camera.idealized_camera()
 
-            # Grab the points used to estimate F
-            pt = self.x1.loc[self.mask].T
-            pt1 = self.x2.loc[self.mask].T
+            # Grab the points used to estimate F as contiguous (3, n) arrays
+            # so that each LM iteration avoids dataframe arithmetic
+            pt = np.ascontiguousarray(self._x1_arr[self._mask_arr].T)
+            pt1 = np.ascontiguousarray(self._x2_arr[self._mask_arr].T)
 
             if pt.shape[1] < 9 or pt1.shape[1] < 9:
                 warnings.warn("Unable to apply MLE.  Not enough correspondences.")
@@ -364,9 +631,15 @@ class FundamentalMatrix(TransformationMatrix):
 
             gold_standard_p = result.x.reshape(3, 4) # SciPy Lst. Sq. requires a vector, camera is 3x4
             optimality = result.optimality
-            gold_standard_f = camera_utils.crossform(gold_standard_p[:,3]).dot(gold_standard_p[:,:3])
+            # F = [t]x M, expanded row-wise to avoid building the skew matrix
+            a, b, c = gold_standard_p[:, 3]
+            M = gold_standard_p[:, :3]
+            gold_standard_f = np.stack([-c * M[1] + b * M[2],
+                                        c * M[0] - a * M[2],
+                                        -b * M[0] + a * M[1]])
 
             self[:] = gold_standard_f
+            self._enforce_singularity_constraint()
 
 
     def _enforce_singularity_constraint(self):
@@ -380,10 +653,12 @@ class FundamentalMatrix(TransformationMatrix):
         .. [Hartley2003]
 
         """
-        if self.rank != 2:
-            u, d, vt = np.linalg.svd(self)
-            f1 = u.dot(np.diag([d[0], d[1], 0])).dot(vt)
-            self[:] = f1
+        # Zeroing an already zero singular value is a no-op, so the
+        # reconstruction is applied without first checking the rank
+        u, d, vt = np.linalg.svd(np.asarray(self))
+        # Equivalent to u.dot(np.diag([d[0], d[1], 0])).dot(vt)
+        f1 = (u[:, :2] * d[:2]).dot(vt[:2, :])
+        self[:] = f1
 
     def recompute_matrix(self):
         raise NotImplementedError
@@ -411,9 +686,41 @@ class Homography(TransformationMatrix):
     def error(self):
         return self.compute_error(self.x1, self.x2)
 
+    def _clean_attrs(self):
+        super(Homography, self)._clean_attrs()
+        self._inv = None
+
     @property
     def inverse(self):
-        return np.linalg.inv(self)
+        """
+        The inverse computed from the adjugate and the closed form determinant.
+
+        Returns
+        -------
+         : ndarray
+           (3,3) read-only array shared between calls.  Use
+           H.inverse.copy() when a writable inverse is needed.
+        """
+        self._validate_cache()
+        if self._inv is None:
+            a = np.asarray(self)
+            adj = np.empty((3, 3))
+            adj[0, 0] = a[1, 1] * a[2, 2] - a[1, 2] * a[2, 1]
+            adj[0, 1] = a[0, 2] * a[2, 1] - a[0, 1] * a[2, 2]
+            adj[0, 2] = a[0, 1] * a[1, 2] - a[0, 2] * a[1, 1]
+            adj[1, 0] = a[1, 2] * a[2, 0] - a[1, 0] * a[2, 2]
+            adj[1, 1] = a[0, 0] * a[2, 2] - a[0, 2] * a[2, 0]
+            adj[1, 2] = a[0, 2] * a[1, 0] - a[0, 0] * a[1, 2]
+            adj[2, 0] = a[1, 0] * a[2, 1] - a[1, 1] * a[2, 0]
+            adj[2, 1] = a[0, 1] * a[2, 0] - a[0, 0] * a[2, 1]
+            adj[2, 2] = a[0, 0] * a[1, 1] - a[0, 1] * a[1, 0]
+            det = self.determinant
+            if det == 0:
+                raise np.linalg.LinAlgError('Singular matrix')
+            adj /= det
+            adj.flags.writeable = False
+            self._inv = adj
+        return self._inv
 
     def compute_error(self, a, b, mask=None):
         """
@@ -450,24 +757,45 @@ class Homography(TransformationMatrix):
         a = a[mask].values
         b = b[mask].values
 
+        # Promote to homogeneous coordinates in a single preallocated buffer
         if a.shape[1] == 2:
-            a = make_homogeneous(a)
+            tmp = np.empty((a.shape[0], 3), dtype=np.float64)
+            tmp[:, :2] = a
+            tmp[:, 2] = 1.0
+            a = tmp
         if b.shape[1] == 2:
-            b = make_homogeneous(b)
-
-        # ToDo: Vectorize for performance
-        for i, j in enumerate(a):
-            a[i] = self.dot(j)
-            a[i] /= a[i][-1]
+            tmp = np.empty((b.shape[0], 3), dtype=np.float64)
+            tmp[:, :2] = b
+            tmp[:, 2] = 1.0
+            b = tmp
 
         data = np.empty((a.shape[0], 4))
 
-        data[:, 0] = x_res = b[:, 0] - a[:, 0]
-        data[:, 1] = y_res = b[:, 1] - a[:, 1]
-        data[:, 2] = rms = np.sqrt(x_res**2 + y_res**2)
-        total_rms = np.sqrt(np.mean(x_res**2 + y_res**2))
-        x_rms = np.sqrt(np.mean(x_res**2))
-        y_rms = np.sqrt(np.mean(y_res**2))
+        if njit is not None:
+            sx2, sy2 = _homog_residuals(np.asarray(self, dtype=np.float64),
+                                        np.ascontiguousarray(a, dtype=np.float64),
+                                        np.ascontiguousarray(b, dtype=np.float64),
+                                        data)
+            n = a.shape[0]
+            rms = data[:, 2]
+            total_rms = math.sqrt((sx2 + sy2) / n)
+            x_rms = math.sqrt(sx2 / n)
+            y_rms = math.sqrt(sy2 / n)
+        else:
+            # Project all points at once and normalize the homogeneous coordinate
+            a = a.dot(np.asarray(self).T)
+            a /= a[:, 2:3]
+
+            data[:, 0] = x_res = b[:, 0] - a[:, 0]
+            data[:, 1] = y_res = b[:, 1] - a[:, 1]
+            # Square the residuals once and reuse them for all of the statistics
+            x2 = x_res * x_res
+            y2 = y_res * y_res
+            s = x2 + y2
+            data[:, 2] = rms = np.sqrt(s)
+            total_rms = math.sqrt(s.mean())
+            x_rms = math.sqrt(x2.mean())
+            y_rms = math.sqrt(y2.mean())
 
         data[:, 3] = rms / total_rms
 
@@ -483,7 +811,7 @@ class Homography(TransformationMatrix):
         df.y_rms = y_rms
         return df
 
-    def compute(self, kp1, kp2, method='ransac', reproj_threshold=2.0):
+    def compute(self, kp1, kp2, method='ransac', reproj_threshold=2.0, normalize=False):
         """
         Compute a planar homography given two sets of keypoints
 
@@ -502,6 +830,12 @@ class Homography(TransformationMatrix):
         reproj_threshold : float
                            The maximum distances in pixels a reprojected points
                            can be from the epipolar line to be considered an inlier
+
+        normalize : bool
+                    If True, center and scale the correspondences before
+                    estimation and de-normalize the resulting matrix.  The
+                    reprojective threshold is scaled into the normalized
+                    space of the destination image.
         """
         self.x1 = kp1
         self.x2 = kp2
@@ -514,10 +848,25 @@ class Homography(TransformationMatrix):
             method_ = 0  # Normal method
         else:
             raise ValueError("Unknown outlier detection method.  Choices are: 'ransac', 'lmeds', or 'normal'.")
-        transformation_matrix, mask = cv2.findHomography(kp1,
-                                                         kp2,
+
+        if normalize:
+            pts1, t1 = _normalize(kp1)
+            pts2, t2 = _normalize(kp2)
+            threshold = reproj_threshold * t2[0, 0]
+        else:
+            pts1 = kp1
+            pts2 = kp2
+            threshold = reproj_threshold
+
+        transformation_matrix, mask = cv2.findHomography(pts1,
+                                                         pts2,
                                                          method_,
-                                                         reproj_threshold)
+                                                         threshold)
+        if normalize and transformation_matrix is not None:
+            # Undo the normalization, H = T2^-1 H_n T1
+            transformation_matrix = np.linalg.inv(t2).dot(transformation_matrix).dot(t1)
+            if transformation_matrix[2, 2] != 0:
+                transformation_matrix /= transformation_matrix[2, 2]
         if mask is not None:
             mask = mask.astype(bool)
         self.mask = mask